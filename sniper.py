@@ -1,11 +1,18 @@
 import streamlit as st
-import requests
+import httpx
 import pandas as pd
+import numpy as np
+import orjson
 import re
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from urllib.parse import urlparse
 
 # --- CONFIGURATION ---
 POLY_URL = "https://gamma-api.polymarket.com/events"
+URL_RE = re.compile(r'https?://[^\s\)]+')
 st.set_page_config(page_title="PolySource Scout", layout="wide", page_icon="🔍")
 
 # --- CSS ---
@@ -21,54 +28,84 @@ if 'market_data' not in st.session_state:
     st.session_state['market_data'] = pd.DataFrame()
 
 # --- LOGIC ---
+@st.cache_resource
+def get_http():
+    # One HTTP/2 client per server process; concurrent page requests share a single connection
+    transport = httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    )
+    return httpx.Client(transport=transport, timeout=httpx.Timeout(10.0, connect=3.05))
+
+@lru_cache(maxsize=4096)
 def extract_source(description):
     if not description: return "Unknown"
-    urls = re.findall(r'(https?://[^\s\)]+)', description)
-    if urls:
-        domain = urlparse(urls[0]).netloc
-        return domain.replace('www.', '')
-    return "No Link / General"
+    m = URL_RE.search(description)
+    if not m: return "No Link / General"
+    try: return urlparse(m.group(0)).netloc.removeprefix('www.')
+    except ValueError: return "No Link / General"  # e.g. "[https://x.com]" parses as a bad IPv6 host
+
+def _fetch_page(page, client):
+    # Returns the raw events for one page ([] past the last page); raises if the request fails
+    params = {"closed": "false", "limit": 50, "offset": page*50, "order": "volume", "ascending": "false"}
+    # The transport only retries connection errors; retry transient gateway errors here
+    for attempt in range(3):
+        if attempt: time.sleep(0.3 * 2 ** (attempt - 1))
+        r = client.get(POLY_URL, params=params)
+        if r.status_code not in (502, 503, 504): break
+    r.raise_for_status()
+    return orjson.loads(r.content) or []
 
+def _events_to_frame(events):
+    # One pass over the events, then a single DataFrame construction
+    rows = []
+    for e in events:
+        markets = e.get('markets') or []
+        if not markets: continue
+        tags = e.get('tags') or []
+        desc = e.get('description') or ''
+        cat = tags[0].get('label') if tags else None
+        rows.append({
+            "Category": cat or "Uncategorized",
+            "Source": extract_source(desc),
+            "Event": e.get('title'),
+            "Volume": float(markets[0].get('volume') or 0),
+            "Slug": e.get('slug'),
+            # Deep Dive only shows the first 300 chars, so truncate once here
+            "Desc": desc[:300] + "..." if len(desc) > 300 else desc
+        })
+    return pd.DataFrame(rows)
+
+@st.cache_data(ttl=300, show_spinner=False)
 def fetch_data(pages):
-    all_data = []
-    bar = st.progress(0, text="Scanning API...")
-    
-    for page in range(pages):
-        try:
-            params = {"closed": "false", "limit": 50, "offset": page*50, "order": "volume", "ascending": "false"}
-            r = requests.get(POLY_URL, params=params)
-            if not r.ok: break
-            events = r.json()
+    all_events = []
+
+    # Pages are independent, so fetch them concurrently; ex.map keeps page order
+    # and we still stop at the first empty page like the sequential scan did.
+    # A failed page raises out of here so the partial scan is never cached.
+    with ThreadPoolExecutor(max_workers=min(pages, 8)) as ex:
+        for events in ex.map(partial(_fetch_page, client=get_http()), range(pages)):
             if not events: break
-            
-            for e in events:
-                tags = e.get('tags', [])
-                cat = tags[0]['label'] if tags else "Uncategorized"
-                src = extract_source(e.get('description', ''))
-                markets = e.get('markets', [])
-                if markets:
-                    all_data.append({
-                        "Category": cat,
-                        "Source": src,
-                        "Event": e.get('title'),
-                        "Volume": float(markets[0].get('volume', 0)),
-                        "Slug": e.get('slug'),
-                        "Desc": e.get('description', '')
-                    })
-        except: break
-        bar.progress((page + 1) / pages)
-    
-    bar.empty()
-    return pd.DataFrame(all_data)
+            all_events.append(events)
+
+    if not all_events: return pd.DataFrame()
+    return _events_to_frame(list(itertools.chain.from_iterable(all_events)))
 
 # --- SIDEBAR CONTROLS ---
 st.sidebar.title("🔍 Config")
 scan_depth = st.sidebar.slider("Scan Depth", 1, 10, 3)
 
+force_refresh = st.sidebar.checkbox("Force refresh", help="Scans are cached for 5 minutes; tick to bypass the cache")
+
 if st.sidebar.button("🚀 START NEW SCAN", type="primary"):
-    with st.spinner("Fetching fresh data..."):
-        df = fetch_data(scan_depth)
-        st.session_state['market_data'] = df # Save to memory
+    if force_refresh: fetch_data.clear()
+    with st.spinner("Scanning markets..."):
+        try:
+            df = fetch_data(scan_depth)
+            st.session_state['market_data'] = df # Save to memory
+        except Exception as e:
+            st.sidebar.error(f"Scan failed, try again: {e}")
 
 st.sidebar.divider()
 
@@ -96,13 +133,16 @@ if not df.empty:
     )
     
     # --- FILTER LOGIC ---
+    # Build one boolean mask and slice once instead of filtering twice
+    mask = np.ones(len(df), dtype=bool)  # writable, unlike to_numpy() views under copy-on-write
     # Apply Category Filter
     if selected_cats:
-        df = df[df['Category'].isin(selected_cats)]
+        mask &= df['Category'].isin(selected_cats).to_numpy()
         
     # Apply Source Filter (If empty, we assume user wants ALL sources)
     if selected_sources:
-        df = df[df['Source'].isin(selected_sources)]
+        mask &= df['Source'].isin(selected_sources).to_numpy()
+    df = df[mask]
 
 # --- MAIN UI ---
 st.title("Polymarket Source Scout")
@@ -122,20 +162,23 @@ else:
     
     # Interactive Table
     st.dataframe(
-        df[['Category', 'Source', 'Event', 'Volume']],
+        df[['Category', 'Source', 'Event', 'Volume']].assign(Link="https://polymarket.com/event/" + df['Slug']),
         column_config={
             "Volume": st.column_config.NumberColumn(format="$%d"),
             "Source": st.column_config.TextColumn(width="medium"),
+            "Link": st.column_config.LinkColumn("Market", display_text="Go to Market"),
         },
         use_container_width=True,
         height=500
     )
     
     # Direct Links Section
+    # One detail panel driven by a selectbox instead of an expander per row
     st.subheader("Deep Dive")
-    for i, row in df.iterrows():
-        with st.expander(f"[{row['Category']}] {row['Event']}"):
-            st.write(f"**Source:** {row['Source']}")
-            st.write(f"**Volume:** ${row['Volume']:,.0f}")
-            st.caption(row['Desc'][:300] + "...")
-            st.markdown(f"[Go to Market](https://polymarket.com/event/{row['Slug']})")
\ No newline at end of file
+    labels = ("[" + df['Category'] + "] " + df['Event'].fillna('')).tolist()
+    pick = st.selectbox("Select Event", range(len(df)), format_func=labels.__getitem__)
+    row = df.iloc[pick]
+    st.write(f"**Source:** {row['Source']}")
+    st.write(f"**Volume:** ${row['Volume']:,.0f}")
+    st.caption(row['Desc'])
+    st.markdown(f"[Go to Market](https://polymarket.com/event/{row['Slug']})")